@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from user_context import UserRepository
+
+
+# Asynchronous ingestion of login/logout/activity events.
+#
+# Producers hand events to a bounded asyncio.Queue without blocking. A single
+# consumer folds them into per-user pending state (latest last_login and
+# last_activity, as in UserActivity) plus an append-only activity log (as in
+# UserActivities.activities), and flushes both to the database when either the
+# batch size or the flush interval is reached. While a flush is running the
+# queue keeps filling; once it is full, `put` waits and `submit` reports the
+# event as rejected, which is the backpressure signal for callers.
+#
+# A failed write puts the batch back and is retried with exponential backoff;
+# the consumer keeps folding new events into that batch until it reaches the
+# batch size, after which the queue absorbs the rest. `stop` asks the consumer
+# to drain and flush what is queued and waits for it to exit, so the last write
+# is never cut off. If writes keep failing while stopping, the unflushed events
+# stay in `pending`/`log` and are logged as an error.
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100_000
+BATCH_SIZE = 10_000
+FLUSH_INTERVAL = 0.25  # seconds
+MAX_RETRY_DELAY = 5.0  # seconds
+STOP_RETRIES = 3
+
+UPSERT_ACTIVITY_SQL = text("""
+    INSERT INTO user_activity (user_id, last_login, last_activity, created_at, updated_at, is_active, is_deleted)
+    VALUES (:user_id, :last_login, :last_activity, :updated_at, :updated_at, 1, 0)
+    ON DUPLICATE KEY UPDATE
+        last_login = COALESCE(VALUES(last_login), last_login),
+        last_activity = VALUES(last_activity),
+        updated_at = VALUES(updated_at)
+""")
+
+INSERT_LOG_SQL = text("""
+    INSERT INTO user_activities (user_id, activity, timestamp)
+    VALUES (:user_id, :activity, :timestamp)
+""")
+
+
+class ActivityWriter():
+    """
+    Writes one flushed batch: an upsert per user and the raw activity log.
+    """
+    def __init__(self, engine, users: Optional[UserRepository] = None):
+        self.engine = engine
+        self.users = users
+
+    def write(self, pending: Dict[int, dict], log: List[dict]):
+        updated_at = datetime.utcnow().isoformat()
+        with self.engine.begin() as conn:
+            conn.execute(
+                UPSERT_ACTIVITY_SQL,
+                [{"user_id": user_id, "updated_at": updated_at, **state} for user_id, state in pending.items()],
+            )
+            conn.execute(INSERT_LOG_SQL, log)
+        if self.users is not None:
+            # cached UserContext.activity is stale once its row changes
+            for user_id in pending:
+                self.users.invalidate(user_id)
+
+
+class ActivityBuffer():
+    """
+    Bounded, coalescing buffer between request handlers and the activity tables.
+    """
+    def __init__(
+        self,
+        writer: ActivityWriter,
+        queue_size: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.pending: Dict[int, dict] = {}
+        self.log: List[dict] = []
+        self.rejected = 0
+        self.flushed = 0
+        self.max_latency = 0.0
+        self._oldest: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failures = 0
+
+    def submit(self, user_id: int, activity: str, timestamp: Optional[str] = None) -> bool:
+        """Queue an event without waiting; returns False if the buffer is full."""
+        try:
+            self.queue.put_nowait((user_id, activity, timestamp or datetime.utcnow().isoformat(), time.monotonic()))
+            return True
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+
+    async def put(self, user_id: int, activity: str, timestamp: Optional[str] = None):
+        """Queue an event, waiting for space when the buffer is full."""
+        await self.queue.put((user_id, activity, timestamp or datetime.utcnow().isoformat(), time.monotonic()))
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Let the consumer drain and flush everything already queued, and wait for it to exit."""
+        if self._task is None:
+            self.start()
+        self._stopping = True
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._stopping = False
+            self._failures = 0
+
+    def _fold(self, event: tuple):
+        user_id, activity, timestamp, enqueued_at = event
+        if self._oldest is None:
+            self._oldest = enqueued_at
+        state = self.pending.get(user_id)
+        if state is None:
+            state = self.pending[user_id] = {"last_login": None, "last_activity": timestamp}
+        elif timestamp > state["last_activity"]:
+            state["last_activity"] = timestamp
+        if activity == "login" and (state["last_login"] is None or timestamp > state["last_login"]):
+            state["last_login"] = timestamp
+        self.log.append({"user_id": user_id, "activity": activity, "timestamp": timestamp})
+
+    def _drain(self):
+        queue = self.queue
+        while len(self.log) < self.batch_size and not queue.empty():
+            self._fold(queue.get_nowait())
+
+    async def _flush(self):
+        if not self.log:
+            return
+        pending, log, oldest = self.pending, self.log, self._oldest
+        self.pending, self.log, self._oldest = {}, [], None
+        try:
+            await asyncio.to_thread(self.writer.write, pending, log)
+        except Exception:
+            # only the consumer folds events, so nothing was added while the write ran
+            self.pending, self.log, self._oldest = pending, log, oldest
+            raise
+        self.flushed += len(log)
+        self.max_latency = max(self.max_latency, time.monotonic() - oldest)
+
+    async def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        while not (self._stopping and self.queue.empty() and not self.log):
+            backing_off = self._failures > 0
+            if self._stopping and not backing_off:
+                deadline = time.monotonic()
+            timeout = deadline - time.monotonic()
+            if timeout > 0:
+                if len(self.log) < self.batch_size:
+                    try:
+                        self._fold(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    # the batch is full and its last write failed: wait out the retry delay
+                    await asyncio.sleep(timeout)
+            self._drain()
+            if time.monotonic() >= deadline or (len(self.log) >= self.batch_size and not backing_off):
+                try:
+                    await self._flush()
+                except Exception:
+                    self._failures += 1
+                    delay = min(self.flush_interval * 2 ** self._failures, MAX_RETRY_DELAY)
+                    if self._stopping and self._failures > STOP_RETRIES:
+                        logger.exception("activity flush failed, stopping with %d unflushed events",
+                                         len(self.log) + self.queue.qsize())
+                        return
+                    logger.exception("activity flush failed (attempt %d), retrying %d events in %.2fs",
+                                     self._failures, len(self.log), delay)
+                    deadline = time.monotonic() + delay
+                else:
+                    self._failures = 0
+                    deadline = time.monotonic() + self.flush_interval
+
+
+if __name__ == "__main__":
+    # Load generator: offers events at a fixed rate and reports sustained
+    # throughput and worst submit-to-flush latency. The writer only counts rows,
+    # so this measures the buffer itself rather than the database.
+    import random
+    import sys
+
+    class CountingWriter():
+        def __init__(self):
+            self.rows = 0
+            self.users = 0
+
+        def write(self, pending, log):
+            self.rows += len(log)
+            self.users += len(pending)
+
+    async def load(rate: int, seconds: float, users: int):
+        writer = CountingWriter()
+        buffer = ActivityBuffer(writer)
+        buffer.start()
+        activities = ("login", "logout", "view", "view", "view")
+        tick = 0.01
+        per_tick = int(rate * tick)
+        start = time.monotonic()
+        sent = 0
+        while time.monotonic() - start < seconds:
+            timestamp = datetime.utcnow().isoformat()
+            for _ in range(per_tick):
+                buffer.submit(random.randrange(users), random.choice(activities), timestamp)
+            sent += per_tick
+            # yield to the consumer, then sleep off whatever is left of the tick
+            await asyncio.sleep(max(0.0, start + (sent / per_tick) * tick - time.monotonic()))
+        await buffer.stop()
+        elapsed = time.monotonic() - start
+        print(f"offered  {sent / seconds:>10,.0f} events/s for {seconds:.0f}s")
+        print(f"flushed  {buffer.flushed / elapsed:>10,.0f} events/s ({buffer.flushed:,} events, {writer.users:,} user upserts)")
+        print(f"rejected {buffer.rejected:>10,}")
+        print(f"max submit-to-flush latency {buffer.max_latency * 1e3:.0f}ms")
+
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    asyncio.run(load(rate, seconds=5, users=20_000))
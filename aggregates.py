@@ -0,0 +1,311 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from typedefs.user import InstructorPayment, InstructorRevenue, UserEnrolment, UserFeedback
+
+
+# Dashboard aggregates over enrolments, feedback, revenue and payments.
+#
+# Records are ingested in batches as NumPy columns. Every source keeps the last
+# contribution of each record (keyed by its id) next to materialized per-group
+# totals, so a re-sent or updated record first subtracts its old contribution
+# and then adds the new one. Group-by is a `np.bincount` over dense group slots,
+# and dashboard queries read the materialized totals directly.
+#
+# Revenue is kept per enrolment and rolled up to courses through the
+# enrolment's current course, so revenue that arrives before its enrolment, or
+# an enrolment that moves to another course, still lands on the right course.
+
+# InstructorPayment.payment_status values that count as money paid out or in flight;
+# anything else (failed, cancelled, refunded, ...) is ignored
+PAID_STATUSES = ("completed", "paid", "succeeded", "success")
+PENDING_STATUSES = ("pending", "processing")
+
+
+class _KeyIndex():
+    """
+    Maps arbitrary integer ids to dense slots 0..n-1, in first-seen order.
+    """
+    def __init__(self):
+        self.positions = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        slots = np.empty(len(unique), dtype=np.int64)
+        positions = self.positions
+        for i, key in enumerate(unique.tolist()):
+            slot = positions.get(key)
+            if slot is None:
+                slot = positions[key] = len(positions)
+            slots[i] = slot
+        return slots[inverse]
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """Like lookup, but unknown ids map to -1 instead of being added."""
+        get = self.positions.get
+        return np.fromiter((get(key, -1) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+
+    def get(self, key: int) -> Optional[int]:
+        return self.positions.get(key)
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    if len(array) >= size:
+        return array
+    grown = np.full((max(size, 2 * len(array)),) + array.shape[1:], fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def _add_by_group(totals: np.ndarray, size: int, group_slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # adds each row of `values` to `totals[group]`, skipping rows without a group (-1)
+    totals = _grow(totals, size, 0.0)
+    mask = group_slots >= 0
+    if mask.any():
+        group_slots, values = group_slots[mask], values[mask]
+        length = int(group_slots.max()) + 1
+        for column in range(values.shape[1]):
+            totals[:length, column] += np.bincount(group_slots, weights=values[:, column], minlength=length)
+    return totals
+
+
+def _last_occurrence(keys: np.ndarray) -> np.ndarray:
+    # indices of the last row for each key, so a batch with repeated ids keeps the newest
+    _, first_in_reversed = np.unique(keys[::-1], return_index=True)
+    return np.sort(len(keys) - 1 - first_in_reversed)
+
+
+class _Ledger():
+    """
+    Keyed records contributing value columns to per-group totals.
+    """
+    def __init__(self, groups: _KeyIndex, columns: tuple):
+        self.groups = groups
+        self.columns = {name: i for i, name in enumerate(columns)}
+        self.records = _KeyIndex()
+        self.record_group = np.full(0, -1, dtype=np.int64)
+        self.record_values = np.zeros((0, len(columns)))
+        self.totals = np.zeros((0, len(columns)))
+
+    def apply(self, keys: np.ndarray, group_slots: np.ndarray, values: np.ndarray):
+        latest = _last_occurrence(keys)
+        keys, group_slots, values = keys[latest], group_slots[latest], values[latest]
+        slots = self.records.lookup(keys)
+        size = len(self.records)
+        self.record_group = _grow(self.record_group, size, -1)
+        self.record_values = _grow(self.record_values, size, 0.0)
+
+        self._accumulate(self.record_group[slots], -self.record_values[slots])
+        self.record_group[slots] = group_slots
+        self.record_values[slots] = values
+        self._accumulate(group_slots, values)
+
+    def _accumulate(self, group_slots: np.ndarray, values: np.ndarray):
+        self.totals = _add_by_group(self.totals, len(self.groups), group_slots, values)
+
+    def record_groups(self, keys: np.ndarray) -> np.ndarray:
+        """Current group of each key, -1 for keys never applied."""
+        slots = self.records.find(keys)
+        groups = np.full(len(keys), -1, dtype=np.int64)
+        known = slots >= 0
+        groups[known] = self.record_group[slots[known]]
+        return groups
+
+    def rows(self, group_slots: np.ndarray) -> np.ndarray:
+        self.totals = _grow(self.totals, len(self.groups), 0.0)
+        return self.totals[group_slots].copy()
+
+    def total(self, slot: Optional[int], column: str) -> float:
+        if slot is None or slot >= len(self.totals):
+            return 0.0
+        return float(self.totals[slot, self.columns[column]])
+
+    def column(self, column: str, size: int) -> np.ndarray:
+        return _grow(self.totals, size, 0.0)[:size, self.columns[column]]
+
+
+class DashboardAggregates():
+    """
+    Incrementally maintained per-course and per-instructor dashboard figures.
+    """
+    def __init__(self):
+        self.courses = _KeyIndex()
+        self.instructors = _KeyIndex()
+        self.enrolments = _Ledger(self.courses, ("enrolments", "completed", "progress"))
+        self.feedback = _Ledger(self.courses, ("ratings", "rating_sum"))
+        # revenue grouped by enrolment slot, rolled up into course_revenue below
+        self.enrolment_revenue = _Ledger(self.enrolments.records, ("revenue", "instructor_share"))
+        self.course_revenue = np.zeros((0, 2))
+        self.instructor_revenue = _Ledger(self.instructors, ("revenue", "instructor_share"))
+        self.payments = _Ledger(self.instructors, ("payments", "paid", "pending"))
+
+    def _enrolment_courses(self, enrolment_slots: np.ndarray) -> np.ndarray:
+        # enrolment slots can be created by revenue rows before the enrolment itself arrives
+        ledger = self.enrolments
+        ledger.record_group = _grow(ledger.record_group, len(ledger.records), -1)
+        return ledger.record_group[enrolment_slots]
+
+    def _add_course_revenue(self, enrolment_slots: np.ndarray, values: np.ndarray):
+        course_slots = self._enrolment_courses(enrolment_slots)
+        self.course_revenue = _add_by_group(self.course_revenue, len(self.courses), course_slots, values)
+
+    # -- columnar ingestion -------------------------------------------------
+
+    def add_enrolment_columns(self, enrolment_id, course_id, progress, is_completed, live):
+        live = np.asarray(live, dtype=np.float64)
+        values = np.column_stack((live, np.asarray(is_completed, dtype=np.float64) * live, np.asarray(progress, dtype=np.float64) * live))
+        course_slots = self.courses.lookup(np.asarray(course_id, dtype=np.int64))
+        enrolment_id = np.asarray(enrolment_id, dtype=np.int64)
+        touched = np.unique(self.enrolments.records.lookup(enrolment_id))
+        old_courses = self._enrolment_courses(touched)
+        self.enrolments.apply(enrolment_id, course_slots, values)
+        # move revenue already booked against enrolments whose course changed
+        # (including enrolments seen first through their revenue)
+        new_courses = self._enrolment_courses(touched)
+        moved = old_courses != new_courses
+        if moved.any():
+            revenue = self.enrolment_revenue.rows(touched[moved])
+            size = len(self.courses)
+            self.course_revenue = _add_by_group(self.course_revenue, size, old_courses[moved], -revenue)
+            self.course_revenue = _add_by_group(self.course_revenue, size, new_courses[moved], revenue)
+
+    def add_feedback_columns(self, feedback_id, course_id, rating, live):
+        live = np.asarray(live, dtype=np.float64)
+        values = np.column_stack((live, np.asarray(rating, dtype=np.float64) * live))
+        course_slots = self.courses.lookup(np.asarray(course_id, dtype=np.int64))
+        self.feedback.apply(np.asarray(feedback_id, dtype=np.int64), course_slots, values)
+
+    def add_revenue_columns(self, revenue_id, instructor_id, enrolment_id, revenue, revenue_split):
+        revenue = np.asarray(revenue, dtype=np.float64)
+        values = np.column_stack((revenue, revenue * np.asarray(revenue_split, dtype=np.float64)))
+        revenue_id = np.asarray(revenue_id, dtype=np.int64)
+        ledger = self.enrolment_revenue
+        enrolment_slots = self.enrolments.records.lookup(np.asarray(enrolment_id, dtype=np.int64))
+        previous = ledger.record_groups(revenue_id)
+        touched = np.unique(np.concatenate((previous[previous >= 0], enrolment_slots)))
+        before = ledger.rows(touched)
+        ledger.apply(revenue_id, enrolment_slots, values)
+        self._add_course_revenue(touched, ledger.rows(touched) - before)
+        instructor_slots = self.instructors.lookup(np.asarray(instructor_id, dtype=np.int64))
+        self.instructor_revenue.apply(revenue_id, instructor_slots, values)
+
+    def add_payment_columns(self, payment_id, instructor_id, amount, payment_status):
+        amount = np.asarray(amount, dtype=np.float64)
+        status = np.char.lower(np.asarray(payment_status, dtype=str))
+        paid = np.isin(status, PAID_STATUSES)
+        pending = np.isin(status, PENDING_STATUSES)
+        values = np.column_stack((np.ones_like(amount), amount * paid, amount * pending))
+        instructor_slots = self.instructors.lookup(np.asarray(instructor_id, dtype=np.int64))
+        self.payments.apply(np.asarray(payment_id, dtype=np.int64), instructor_slots, values)
+
+    # -- model ingestion ----------------------------------------------------
+
+    def add_enrolments(self, enrolments: Iterable[UserEnrolment]):
+        rows = [(e.enrolment_id, e.course_id, e.progress, e.is_completed, e.is_active and not e.is_deleted) for e in enrolments]
+        if rows:
+            self.add_enrolment_columns(*zip(*rows))
+
+    def add_feedback(self, feedback: Iterable[UserFeedback]):
+        rows = [(f.feedback_id, f.course_id, f.rating, f.is_active and not f.is_deleted) for f in feedback]
+        if rows:
+            self.add_feedback_columns(*zip(*rows))
+
+    def add_revenue(self, revenue: Iterable[InstructorRevenue]):
+        rows = [(r.revenue_id, r.instructor_id, r.enrolment_id, r.revenue, r.revenue_split) for r in revenue]
+        if rows:
+            self.add_revenue_columns(*zip(*rows))
+
+    def add_payments(self, payments: Iterable[InstructorPayment]):
+        rows = [(p.payment_id, p.instructor_id, p.amount, p.payment_status) for p in payments]
+        if rows:
+            self.add_payment_columns(*zip(*rows))
+
+    # -- queries ------------------------------------------------------------
+
+    def course_summary(self, course_id: int) -> dict:
+        slot = self.courses.get(course_id)
+        enrolments = self.enrolments.total(slot, "enrolments")
+        ratings = self.feedback.total(slot, "ratings")
+        return {
+            "course_id": course_id,
+            "enrolments": int(enrolments),
+            "completion_rate": self.enrolments.total(slot, "completed") / enrolments if enrolments else 0.0,
+            "average_progress": self.enrolments.total(slot, "progress") / enrolments if enrolments else 0.0,
+            "ratings": int(ratings),
+            "average_rating": self.feedback.total(slot, "rating_sum") / ratings if ratings else None,
+            "revenue": float(self.course_revenue[slot, 0]) if slot is not None and slot < len(self.course_revenue) else 0.0,
+        }
+
+    def instructor_summary(self, instructor_id: int) -> dict:
+        slot = self.instructors.get(instructor_id)
+        share = self.instructor_revenue.total(slot, "instructor_share")
+        paid = self.payments.total(slot, "paid")
+        return {
+            "instructor_id": instructor_id,
+            "revenue": self.instructor_revenue.total(slot, "revenue"),
+            "instructor_share": share,
+            "paid": paid,
+            "pending": self.payments.total(slot, "pending"),
+            "outstanding": share - paid,
+        }
+
+    def course_table(self) -> dict:
+        """All per-course figures as aligned NumPy columns."""
+        size = len(self.courses)
+        enrolments = self.enrolments.column("enrolments", size)
+        ratings = self.feedback.column("ratings", size)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "course_id": np.fromiter(self.courses.positions, dtype=np.int64, count=size),
+                "enrolments": enrolments,
+                "completion_rate": np.where(enrolments > 0, self.enrolments.column("completed", size) / enrolments, 0.0),
+                "average_rating": np.where(ratings > 0, self.feedback.column("rating_sum", size) / ratings, np.nan),
+                "revenue": _grow(self.course_revenue, size, 0.0)[:size, 0],
+            }
+
+    def top_courses(self, by: str = "average_rating", limit: int = 10) -> list:
+        table = self.course_table()
+        order = np.argsort(-np.nan_to_num(table[by], nan=-np.inf), kind="stable")[:limit]
+        return [int(course_id) for course_id in table["course_id"][order]]
+
+
+if __name__ == "__main__":
+    # Load a few million synthetic rows, then time incremental batches and queries.
+    import time
+
+    rng = np.random.default_rng(0)
+    n, courses, instructors = 2_000_000, 5_000, 500
+    aggregates = DashboardAggregates()
+
+    start = time.perf_counter()
+    aggregates.add_enrolment_columns(
+        np.arange(n), rng.integers(0, courses, n), rng.uniform(0, 100, n), rng.random(n) < 0.3, np.ones(n)
+    )
+    aggregates.add_feedback_columns(np.arange(n), rng.integers(0, courses, n), rng.integers(1, 6, n), np.ones(n))
+    aggregates.add_revenue_columns(np.arange(n), rng.integers(0, instructors, n), np.arange(n), rng.uniform(5, 100, n), np.full(n, 0.7))
+    aggregates.add_payment_columns(
+        np.arange(n // 10), rng.integers(0, instructors, n // 10), rng.uniform(10, 500, n // 10),
+        rng.choice(["completed", "pending", "failed"], n // 10, p=[0.8, 0.15, 0.05]),
+    )
+    print(f"bulk load of {n:,} rows per source: {time.perf_counter() - start:.2f}s")
+
+    batch = 10_000
+    start = time.perf_counter()
+    aggregates.add_enrolment_columns(
+        rng.integers(0, n + batch, batch), rng.integers(0, courses, batch), rng.uniform(0, 100, batch), rng.random(batch) < 0.5, np.ones(batch)
+    )
+    print(f"incremental batch of {batch:,} enrolments: {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+    start = time.perf_counter()
+    for course_id in range(1000):
+        aggregates.course_summary(course_id)
+    print(f"course_summary: {(time.perf_counter() - start) / 1000 * 1e6:.1f}us/query")
+    start = time.perf_counter()
+    top = aggregates.top_courses()
+    print(f"top_courses over {courses:,} courses: {(time.perf_counter() - start) * 1e3:.2f}ms -> {top[:3]}")
+    print(aggregates.course_summary(top[0]))
+    print(aggregates.instructor_summary(0))
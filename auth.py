@@ -5,8 +5,12 @@ from pathlib import Path
 from typing import Optional
 from enum import Enum
 from typedefs.user import  User
+from instrumentation import instrument
+from user_context import UserRepository
 class Auth():
-    def __init__(self):
+    def __init__(self, users: Optional[UserRepository] = None):
+        # when a repository is given, verified tokens resolve to the cached user
+        self.users = users
         self.private_key = Path(".ssh/private.key").read_text()
         self.public_key = Path(".ssh/public.key").read_text()
         self.algorithm = "RS256"
@@ -31,9 +35,15 @@ class Auth():
         encoded_jwt = jwt.encode(to_encode, self.private_key, algorithm=self.algorithm)
         return encoded_jwt
 
+    @instrument("Auth.verify_jwt_token")
     def verify_jwt_token(self, token: str) -> Optional[User]:
         try:
             payload = jwt.decode(token, self.public_key, algorithms=[self.algorithm])
+            if self.users is not None:
+                context = self.users.get(int(payload.get("sub")))
+                if context is None or context.user.is_deleted or not context.user.is_active:
+                    return None
+                return context.user
             user = User(
                 user_id=int(payload.get("sub")),
                 username=payload.get("username"),
@@ -0,0 +1,312 @@
+import hashlib
+import json
+import struct
+import types
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import lru_cache
+from inspect import isclass
+from typing import Annotated, Any, Iterable, List, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from trusted import _unwrap_optional, trusted_load
+
+try:
+    import msgpack
+except ImportError:  # fall back to positional JSON arrays
+    msgpack = None
+
+
+# Compact wire format for pydantic models.
+#
+# A record is a positional list of field values in `model_fields` order, so key
+# names never go on the wire. Naive datetimes become integer microseconds, and
+# every datetime after the first one in a record is stored as a delta from it
+# (created_at/updated_at pairs usually collapse to a one-byte integer). Lists of
+# dicts that share the same keys are stored once as [keys, rows].
+#
+# Every payload starts with a one-byte format tag and a four-byte schema
+# fingerprint, so a reader rejects data written for a different field layout.
+#
+# Decoding validates by default. Pass `trusted=True` for payloads that came from
+# our own services; models whose validators transform stored values (User
+# re-hashes its password hash) only round-trip that way.
+
+FORMAT_JSON = 0
+FORMAT_MSGPACK = 1
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+_HEADER = struct.Struct(">BI")
+
+
+def _field_kind(annotation: Any) -> tuple:
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) in (list, List):
+        args = get_args(annotation)
+        item = _unwrap_optional(args[0]) if args else Any
+        if isclass(item) and issubclass(item, BaseModel):
+            return ("models", item)
+        if get_origin(item) is dict:
+            return ("dicts", None)
+        return ("plain", None)
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return ("model", annotation)
+    if annotation is datetime:
+        return ("datetime", None)
+    if isclass(annotation) and issubclass(annotation, Enum):
+        return ("enum", None)
+    return ("plain", None)
+
+
+def _type_name(annotation: Any) -> str:
+    # module-independent description, so the same schema imported under another
+    # module name, or Optional[int] rewritten as int | None, fingerprints the same
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        return _type_name(get_args(annotation)[0])
+    if origin is not None:
+        name = "Union" if origin in (Union, types.UnionType) else _type_name(origin)
+        return name + "[" + ",".join(_type_name(arg) for arg in get_args(annotation)) + "]"
+    if isclass(annotation):
+        return annotation.__qualname__
+    return repr(annotation)
+
+
+@lru_cache(maxsize=None)
+def _plan(cls: Type[BaseModel]) -> tuple:
+    return tuple((name, *_field_kind(field.annotation)) for name, field in cls.model_fields.items())
+
+
+def _describe(cls: Type[BaseModel], seen: set) -> str:
+    if cls in seen:
+        return cls.__name__
+    seen.add(cls)
+    parts = []
+    for (name, kind, nested), field in zip(_plan(cls), cls.model_fields.values()):
+        # the full annotation, so int -> str or int -> float changes the fingerprint too
+        parts.append(f"{name}:{kind}:{_type_name(field.annotation)}")
+        if nested is not None:
+            parts.append("(" + _describe(nested, seen) + ")")
+    return cls.__name__ + "{" + ",".join(parts) + "}"
+
+
+@lru_cache(maxsize=None)
+def schema_fingerprint(cls: Type[BaseModel]) -> int:
+    """
+    32-bit fingerprint of a model's field layout, including nested models.
+    """
+    digest = hashlib.sha256(_describe(cls, set()).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big")
+
+
+def _encode_row(model: BaseModel) -> list:
+    row = []
+    base = None
+    values = model.__dict__
+    for name, kind, _ in _plan(type(model)):
+        value = values[name]
+        if value is None:
+            row.append(None)
+        elif kind == "datetime":
+            if value.tzinfo is not None:
+                row.append(value.isoformat())
+            elif base is None:
+                base = value
+                row.append((value - EPOCH) // MICROSECOND)
+            else:
+                row.append((value - base) // MICROSECOND)
+        elif kind == "model":
+            row.append(_encode_row(value))
+        elif kind == "models":
+            row.append([_encode_row(item) for item in value])
+        elif kind == "dicts":
+            keys = list(value[0]) if value else []
+            if all(list(item) == keys for item in value):
+                row.append([keys, [list(item.values()) for item in value]])
+            else:
+                row.append([None, value])
+        elif kind == "enum":
+            row.append(value.value)
+        else:
+            row.append(value)
+    return row
+
+
+def _decode_row(cls: Type[BaseModel], row: list) -> dict:
+    data = {}
+    base = None
+    for (name, kind, nested), value in zip(_plan(cls), row):
+        if value is None:
+            data[name] = None
+        elif kind == "datetime":
+            if isinstance(value, str):
+                data[name] = value
+            elif base is None:
+                base = EPOCH + value * MICROSECOND
+                data[name] = base
+            else:
+                data[name] = base + value * MICROSECOND
+        elif kind == "model":
+            data[name] = _decode_row(nested, value)
+        elif kind == "models":
+            data[name] = [_decode_row(nested, item) for item in value]
+        elif kind == "dicts":
+            keys, rows = value
+            data[name] = rows if keys is None else [dict(zip(keys, item)) for item in rows]
+        else:
+            data[name] = value
+    return data
+
+
+def _pack(payload: Any, fmt: int) -> bytes:
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True, default=str)
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _unpack(body: bytes, fmt: int) -> Any:
+    if fmt == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack is required to decode this payload")
+        return msgpack.unpackb(body, raw=False)
+    if fmt == FORMAT_JSON:
+        return json.loads(body)
+    raise ValueError(f"Unknown codec format {fmt}")
+
+
+def _default_format() -> int:
+    return FORMAT_MSGPACK if msgpack is not None else FORMAT_JSON
+
+
+def _read_header(cls: Type[BaseModel], data: bytes) -> int:
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Payload too short for a {cls.__name__} codec header: {len(data)} bytes")
+    fmt, fingerprint = _HEADER.unpack_from(data)
+    if fingerprint != schema_fingerprint(cls):
+        raise ValueError(
+            f"Schema fingerprint mismatch for {cls.__name__}: "
+            f"payload {fingerprint:08x}, model {schema_fingerprint(cls):08x}"
+        )
+    return fmt
+
+
+def encode(model: BaseModel, fmt: int = None) -> bytes:
+    fmt = _default_format() if fmt is None else fmt
+    return _HEADER.pack(fmt, schema_fingerprint(type(model))) + _pack(_encode_row(model), fmt)
+
+
+def _loader(cls: Type[BaseModel], trusted: bool):
+    if trusted:
+        return lambda row: trusted_load(cls, row)
+    return cls.model_validate
+
+
+def decode(cls: Type[BaseModel], data: bytes, trusted: bool = False) -> BaseModel:
+    fmt = _read_header(cls, data)
+    return _loader(cls, trusted)(_decode_row(cls, _unpack(data[_HEADER.size:], fmt)))
+
+
+def encode_many(models: Iterable[BaseModel], cls: Type[BaseModel], fmt: int = None) -> bytes:
+    """Encode a batch of same-typed models under a single header."""
+    fmt = _default_format() if fmt is None else fmt
+    rows = [_encode_row(model) for model in models]
+    return _HEADER.pack(fmt, schema_fingerprint(cls)) + _pack(rows, fmt)
+
+
+def decode_many(cls: Type[BaseModel], data: bytes, trusted: bool = False) -> List[BaseModel]:
+    fmt = _read_header(cls, data)
+    load = _loader(cls, trusted)
+    return [load(_decode_row(cls, row)) for row in _unpack(data[_HEADER.size:], fmt)]
+
+
+if __name__ == "__main__":
+    # Size and speed comparison against model_dump_json; round trips are
+    # covered by test_codec.py.
+    import contextlib
+    import io
+    import runpy
+    import timeit
+    from pydantic_core import to_json
+    from typedefs.course import Course, CourseCategory, Lesson, Module
+    from typedefs.user import UserActivity, UserEnrolment
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        examples = runpy.run_path("pydantic-example.py")
+    SignupData = examples["SignupData"]
+    UserActivities = examples["UserActivities"]
+
+    now = datetime(2025, 5, 16, 20, 47, 0, 123456)
+    samples = {
+        "SignupData": SignupData(
+            username="jeevanshrestha09",
+            password="password123",
+            confirm_password="password123",
+            created_at=now,
+            updated_at=now,
+        ),
+        "UserActivities": UserActivities(
+            user_id=1,
+            activities=[
+                {"activity": "login" if i % 2 == 0 else "logout", "timestamp": f"2023-10-01T{i % 24:02d}:00:00Z"}
+                for i in range(50)
+            ],
+        ),
+        "UserActivity": UserActivity(
+            user_id=1,
+            last_login="2023-10-01T12:00:00Z",
+            last_activity="2023-10-01T14:00:00Z",
+        ),
+        "UserEnrolment": UserEnrolment(enrolment_id=1, user_id=1, course_id=1, progress=42.5),
+        "Course": Course(
+            course_id=1,
+            title="Pydantic in Depth",
+            description="Models, validators and serialization",
+            instructor_id=7,
+            price=49.0,
+            category=CourseCategory(
+                category_id=2,
+                name="Python",
+                parent_category=CourseCategory(category_id=1, name="Programming"),
+            ),
+            modules=[
+                Module(
+                    module_id=m,
+                    name=f"Module {m}",
+                    description="Module description",
+                    lessons=[
+                        Lesson(
+                            lesson_id=m * 10 + i,
+                            topic=f"Lesson {i}",
+                            description="Lesson description",
+                            duration=600,
+                            lesson_type="video",
+                            content=f"https://example.com/{m}/{i}.mp4",
+                        )
+                        for i in range(5)
+                    ],
+                )
+                for m in range(4)
+            ],
+        ),
+    }
+
+    number = 2000
+    print(f"{'model':<16}{'json B':>8}{'codec B':>9}{'json enc':>10}{'codec enc':>11}{'json dec':>10}{'codec dec':>11}  (us/op)")
+    for name, model in samples.items():
+        cls = type(model)
+        payload = encode(model)
+        as_json = model.model_dump_json()
+        # SignupData's json_encoders write a date format it cannot parse back, so
+        # the decode baseline reads ISO timestamps instead
+        as_iso = to_json(model.model_dump())
+
+        json_enc = timeit.timeit(model.model_dump_json, number=number) / number * 1e6
+        codec_enc = timeit.timeit(lambda: encode(model), number=number) / number * 1e6
+        json_dec = timeit.timeit(lambda: cls.model_validate_json(as_iso), number=number) / number * 1e6
+        codec_dec = timeit.timeit(lambda: decode(cls, payload), number=number) / number * 1e6
+        print(
+            f"{name:<16}{len(as_json):>8}{len(payload):>9}"
+            f"{json_enc:>10.1f}{codec_enc:>11.1f}{json_dec:>10.1f}{codec_dec:>11.1f}"
+        )
+
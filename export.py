@@ -0,0 +1,218 @@
+import gzip
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+
+from trusted import trusted_load
+from typedefs.course import Course
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional, gzip is always available
+    zstandard = None
+
+
+# Nightly catalogue export.
+#
+# Courses are read in keyset pages of PAGE_SIZE courses (course_id > last seen,
+# ORDER BY course_id LIMIT n), joined with their modules and lessons. Within a
+# page, each course is assembled from its adjacent rows, batched into shards,
+# and handed to worker processes that validate and serialize the shard to a
+# compressed NDJSON file. Only the category table, one page and a bounded
+# number of in-flight shards are ever held in memory, regardless of catalogue
+# size.
+#
+# Keyset paging is used instead of a server-side cursor because the
+# mysql+mysqlconnector engine in db.py has no server-side cursor support in
+# SQLAlchemy (stream_results would silently buffer the whole join), and paging
+# works the same on every driver.
+
+SHARD_SIZE = 5_000
+PAGE_SIZE = 500
+
+CATEGORY_SQL = text("""
+    SELECT category_id, name, description, parent_category_id,
+           created_at, updated_at, is_active, is_deleted
+    FROM course_categories
+""")
+
+CATALOGUE_SQL = text("""
+    SELECT c.course_id, c.title, c.description, c.instructor_id, c.thumbnail,
+           c.price, c.discount, c.category_id, c.prerequisites,
+           c.created_at, c.updated_at, c.is_active, c.is_deleted,
+           m.module_id, m.name AS module_name, m.description AS module_description,
+           m.created_at AS module_created_at, m.updated_at AS module_updated_at,
+           m.is_active AS module_is_active, m.is_deleted AS module_is_deleted,
+           l.lesson_id, l.topic, l.description AS lesson_description, l.duration,
+           l.lesson_type, l.content,
+           l.created_at AS lesson_created_at, l.updated_at AS lesson_updated_at,
+           l.is_active AS lesson_is_active, l.is_deleted AS lesson_is_deleted
+    FROM (
+        SELECT * FROM courses
+        WHERE course_id > :last_course_id
+        ORDER BY course_id
+        LIMIT :page_size
+    ) c
+    LEFT JOIN modules m ON m.course_id = c.course_id
+    LEFT JOIN lessons l ON l.module_id = m.module_id
+    ORDER BY c.course_id, m.module_id, l.lesson_id
+""")
+
+COURSE_COLUMNS = (
+    "course_id", "title", "description", "instructor_id", "thumbnail", "price",
+    "discount", "prerequisites", "created_at", "updated_at", "is_active", "is_deleted",
+)
+
+
+def load_categories(conn) -> Dict[int, dict]:
+    """
+    Load every category once and resolve parent chains into nested dicts.
+    """
+    rows = {row["category_id"]: dict(row) for row in conn.execute(CATEGORY_SQL).mappings()}
+    resolved: Dict[int, dict] = {}
+
+    def resolve(category_id: int) -> dict:
+        if category_id not in resolved:
+            category = rows[category_id]
+            parent_id = category.pop("parent_category_id")
+            resolved[category_id] = category
+            category["parent_category"] = resolve(parent_id) if parent_id in rows else None
+        return resolved[category_id]
+
+    for category_id in rows:
+        resolve(category_id)
+    return resolved
+
+
+def _assemble(rows: List[dict], categories: Dict[int, dict]) -> dict:
+    first = rows[0]
+    course = {column: first[column] for column in COURSE_COLUMNS}
+    course["category"] = categories[first["category_id"]]
+    modules = []
+    for module_id, module_rows in groupby(rows, key=itemgetter("module_id")):
+        if module_id is None:
+            continue
+        module_rows = list(module_rows)
+        head = module_rows[0]
+        modules.append({
+            "module_id": module_id,
+            "name": head["module_name"],
+            "description": head["module_description"],
+            "created_at": head["module_created_at"],
+            "updated_at": head["module_updated_at"],
+            "is_active": head["module_is_active"],
+            "is_deleted": head["module_is_deleted"],
+            "lessons": [
+                {
+                    "lesson_id": row["lesson_id"],
+                    "topic": row["topic"],
+                    "description": row["lesson_description"],
+                    "duration": row["duration"],
+                    "lesson_type": row["lesson_type"],
+                    "content": row["content"],
+                    "created_at": row["lesson_created_at"],
+                    "updated_at": row["lesson_updated_at"],
+                    "is_active": row["lesson_is_active"],
+                    "is_deleted": row["lesson_is_deleted"],
+                }
+                for row in module_rows
+                if row["lesson_id"] is not None
+            ],
+        })
+    course["modules"] = modules
+    return course
+
+
+def stream_courses(engine, page_size: int = PAGE_SIZE) -> Iterator[dict]:
+    """
+    Yield one course dict at a time, reading the catalogue in keyset pages of `page_size` courses.
+    """
+    with engine.connect() as conn:
+        categories = load_categories(conn)
+        last_course_id = -1
+        while True:
+            rows = conn.execute(
+                CATALOGUE_SQL, {"last_course_id": last_course_id, "page_size": page_size}
+            ).mappings().all()
+            if not rows:
+                return
+            for course_id, course_rows in groupby(rows, key=itemgetter("course_id")):
+                yield _assemble(list(course_rows), categories)
+            last_course_id = course_id
+
+
+def _open(path: Path, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstandard is required for zstd compression")
+        return zstandard.open(path, "wt", encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+
+
+def write_shard(path: str, courses: List[dict], compression: str = "gzip", trusted: bool = False) -> int:
+    """
+    Validate and serialize one shard of courses to compressed NDJSON. Runs in a worker process.
+    """
+    with _open(Path(path), compression) as out:
+        for course in courses:
+            model = trusted_load(Course, course) if trusted else Course.model_validate(course)
+            out.write(model.model_dump_json())
+            out.write("\n")
+    return len(courses)
+
+
+def export_catalogue(
+    engine,
+    out_dir: str,
+    compression: str = "gzip",
+    shard_size: int = SHARD_SIZE,
+    workers: Optional[int] = None,
+    trusted: bool = False,
+) -> List[str]:
+    """
+    Export the full catalogue to `out_dir` as numbered NDJSON shards and return their paths.
+    """
+    workers = workers or os.cpu_count() or 1
+    suffix = ".ndjson.zst" if compression == "zstd" else ".ndjson.gz"
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    paths: List[str] = []
+    pending = set()
+
+    def submit(pool, shard: List[dict]):
+        # cap in-flight shards so a slow disk cannot make the reader run ahead
+        if len(pending) >= workers * 2:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+            pending.difference_update(done)
+        path = str(Path(out_dir) / f"courses-{len(paths):05d}{suffix}")
+        paths.append(path)
+        pending.add(pool.submit(write_shard, path, shard, compression, trusted))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        shard: List[dict] = []
+        for course in stream_courses(engine):
+            shard.append(course)
+            if len(shard) >= shard_size:
+                submit(pool, shard)
+                shard = []
+        if shard:
+            submit(pool, shard)
+        for future in pending:
+            future.result()
+    return paths
+
+
+if __name__ == "__main__":
+    from db import db
+
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "exports"
+    compression = sys.argv[2] if len(sys.argv) > 2 else "gzip"
+    for path in export_catalogue(db, out_dir, compression=compression):
+        print(path)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, AnyUrl, field_validator, model_validator, computed_field
 from typing import Annotated, Optional, List, Dict
+from instrumentation import instrument
 
 class Address(BaseModel):
     """
@@ -25,6 +26,14 @@ class EmergencyContact(BaseModel):
     def __str__(self):
         return f"EmergencyContact(name={self.name}, relationship={self.relationship}, phone={self.phone})"
 
+# kept outside the wrap validator so the metric covers only this check,
+# not the rest of Patient's validation that runs inside handler()
+@instrument("Patient.check_emergency_contact")
+def require_emergency_contact(model):
+    if model.age > 60 and not model.emergency:
+        raise ValueError("Emergency contact is required for patients over 60 years old")
+    return model
+
 class Patient(BaseModel):
     """
     A class representing a patient with various attributes.
@@ -70,6 +79,7 @@ class Patient(BaseModel):
 
     #computed field example
     @computed_field
+    @instrument("Patient.bmi", cheap=True)
     def bmi(self) -> float:
         if self.weight and self.height:
             height_in_meters = self.height / 100
@@ -81,9 +91,7 @@ class Patient(BaseModel):
     @model_validator(mode='wrap')
     def check_emergency_contact(cls, values, handler):
         model = handler(values)
-        if model.age > 60 and not model.emergency:
-            raise ValueError("Emergency contact is required for patients over 60 years old")
-        return model
+        return require_emergency_contact(model)
     
     def __str__(self):
         return f"Patient(id={self.id}, name={self.name}, age={self.age}, weight={self.weight}, height={self.height}, allergies={self.allergies}, medications={self.medications})"
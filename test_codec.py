@@ -0,0 +1,166 @@
+import contextlib
+import io
+import runpy
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from codec import (
+    FORMAT_JSON,
+    FORMAT_MSGPACK,
+    decode,
+    decode_many,
+    encode,
+    encode_many,
+    msgpack,
+    schema_fingerprint,
+)
+from typedefs.course import Course, CourseCategory, Lesson, Module
+from typedefs.user import User, UserActivity, UserEnrolment
+
+
+with contextlib.redirect_stdout(io.StringIO()):
+    examples = runpy.run_path(str(Path(__file__).with_name("pydantic-example.py")))
+SignupData = examples["SignupData"]
+UserActivities = examples["UserActivities"]
+
+NOW = datetime(2025, 5, 16, 20, 47, 0, 123456)
+
+SAMPLES = {
+    "SignupData": SignupData(
+        username="jeevanshrestha09",
+        password="password123",
+        confirm_password="password123",
+        created_at=NOW,
+        updated_at=NOW,
+    ),
+    "UserActivities": UserActivities(
+        user_id=1,
+        activities=[
+            {"activity": "login" if i % 2 == 0 else "logout", "timestamp": f"2023-10-01T{i:02d}:00:00Z"}
+            for i in range(10)
+        ],
+    ),
+    "UserActivity": UserActivity(user_id=1, last_login="2023-10-01T12:00:00Z", last_activity="2023-10-01T14:00:00Z"),
+    "UserEnrolment": UserEnrolment(enrolment_id=1, user_id=1, course_id=1, progress=42.5),
+    "Course": Course(
+        course_id=1,
+        title="Pydantic in Depth",
+        description="Models, validators and serialization",
+        instructor_id=7,
+        price=49.0,
+        category=CourseCategory(
+            category_id=2,
+            name="Python",
+            parent_category=CourseCategory(category_id=1, name="Programming"),
+        ),
+        modules=[
+            Module(
+                module_id=m,
+                name=f"Module {m}",
+                description="Module description",
+                lessons=[
+                    Lesson(
+                        lesson_id=m * 10 + i,
+                        topic=f"Lesson {i}",
+                        description="Lesson description",
+                        duration=600,
+                        lesson_type="video",
+                        content=f"https://example.com/{m}/{i}.mp4",
+                        created_at=NOW,
+                        updated_at=NOW,
+                    )
+                    for i in range(3)
+                ],
+            )
+            for m in range(2)
+        ],
+    ),
+}
+
+FORMATS = [
+    FORMAT_JSON,
+    pytest.param(FORMAT_MSGPACK, marks=pytest.mark.skipif(msgpack is None, reason="msgpack not installed")),
+]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("name", SAMPLES)
+def test_round_trip(name, fmt):
+    model = SAMPLES[name]
+    assert decode(type(model), encode(model, fmt)) == model
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("name", SAMPLES)
+def test_round_trip_many(name, fmt):
+    model = SAMPLES[name]
+    models = [model, model.model_copy()]
+    assert decode_many(type(model), encode_many(models, type(model), fmt)) == models
+
+
+def test_round_trip_aware_datetime():
+    signup = SAMPLES["SignupData"].model_copy(update={"created_at": NOW.replace(tzinfo=timezone.utc)})
+    assert decode(SignupData, encode(signup)) == signup
+
+
+def test_fingerprint_mismatch_rejected():
+    payload = encode(SAMPLES["UserActivity"])
+    with pytest.raises(ValueError, match="fingerprint mismatch"):
+        decode(UserEnrolment, payload)
+
+
+def test_short_payload_rejected():
+    with pytest.raises(ValueError, match="too short"):
+        decode(UserActivity, b"\x01\x02")
+
+
+def test_unknown_format_rejected():
+    payload = bytearray(encode(SAMPLES["UserActivity"], FORMAT_JSON))
+    payload[0] = 9
+    with pytest.raises(ValueError, match="Unknown codec format"):
+        decode(UserActivity, bytes(payload))
+
+
+def test_fingerprint_ignores_module_and_optional_spelling():
+    class Row(BaseModel):
+        row_id: int
+        note: Optional[str] = None
+        tags: List[str] = []
+
+    class Rewritten(BaseModel):
+        row_id: int
+        note: str | None = None
+        tags: list[str] = []
+
+    Rewritten.__name__ = Rewritten.__qualname__ = "Row"
+    Rewritten.__module__ = "<run_path>"
+    assert schema_fingerprint(Row) == schema_fingerprint(Rewritten)
+
+
+def test_fingerprint_changes_with_field_type():
+    class Row(BaseModel):
+        row_id: int
+
+    class Changed(BaseModel):
+        row_id: str
+
+    Changed.__name__ = Changed.__qualname__ = "Row"
+    assert schema_fingerprint(Row) != schema_fingerprint(Changed)
+
+
+def test_user_round_trip_trusted():
+    # User hashes its password on validation, so it only round-trips trusted
+    user = User(
+        user_id=1,
+        username="jeevanshrestha09",
+        email="jeevan@example.com",
+        password="password123",
+        confirm_password="password123",
+    )
+    payload = encode(user)
+    assert b"password123" not in payload
+    assert decode(User, payload, trusted=True) == user
@@ -0,0 +1,285 @@
+import logging
+import random
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from inspect import isclass
+from typing import Any, Callable, Iterable, List, Optional, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import AnyUrl, BaseModel, EmailStr, ValidationError
+from pydantic_core import PydanticUndefined
+
+
+# Trusted loading for rows read back from our own database.
+#
+# Those rows were validated when they were written, so running regex, email,
+# URL and custom validators again on every read is wasted work. For models whose
+# validation runs any of those, `trusted_load` builds the instance the way
+# `model_construct` does and only coerces the types database drivers actually
+# return (TINYINT booleans, Decimal numbers, datetime vs. ISO strings, enum
+# values, nested dicts). Anything else that does not match the annotation
+# raises ValueError instead of being passed through silently.
+#
+# Models with nothing but plain typed fields validate faster in pydantic-core
+# than any per-field loop in Python, so those still go through
+# `model_validate`, falling back to construction only when it rejects a
+# driver-native value (a DATETIME behind an Optional[str] field, say). The same
+# goes for models whose only Python code is a mode="after" model validator:
+# it runs once on the built model, which is far cheaper than building every
+# field in Python (Course, whose CourseCategory has one, loads about 4x slower
+# that way), and those validators still run. Neither kind of model gets any
+# speedup from trusted mode (the extra dispatch makes them slightly slower);
+# it pays off for the models the benchmark below reports as "construct".
+#
+# `verify_rate` sends a random fraction of rows through full validation as well
+# and logs any difference, to catch drift between stored data and the models.
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"expected bool, got {value!r}")
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, Decimal) and value == value.to_integral_value():
+        return int(value)
+    raise ValueError(f"expected int, got {value!r}")
+
+
+def _to_float(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f"expected float, got {value!r}")
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        # several user tables store timestamps in DATETIME columns behind Optional[str] fields
+        return value.isoformat()
+    raise ValueError(f"expected str, got {value!r}")
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise ValueError(f"expected datetime, got {value!r}")
+
+
+def _passthrough(value):
+    return value
+
+
+_SCALARS = {bool: _to_bool, int: _to_int, float: _to_float, str: _to_str, datetime: _to_datetime}
+
+
+def _converter(annotation: Any) -> Callable:
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) in (list, List):
+        args = get_args(annotation)
+        item = _converter(args[0]) if args else _passthrough
+        if item is _passthrough:
+            return _passthrough
+        return lambda value: [None if v is None else item(v) for v in value]
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return lambda value: value if isinstance(value, annotation) else _construct(annotation, value, 0.0)
+    if isclass(annotation) and issubclass(annotation, Enum):
+        return lambda value: value if isinstance(value, annotation) else annotation(value)
+    if isclass(annotation) and issubclass(annotation, AnyUrl):
+        return lambda value: value if isinstance(value, annotation) else annotation(value)
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    # EmailStr, dicts and other special types are stored as-is
+    return _passthrough
+
+
+@lru_cache(maxsize=None)
+def _plan(cls: Type[BaseModel]) -> tuple:
+    plan = []
+    for name, field in cls.model_fields.items():
+        if field.default_factory is not None:
+            default = field.default_factory
+        elif field.default is PydanticUndefined:
+            default = None  # required; left unset when missing, like model_construct
+        else:
+            value = field.default
+            default = lambda value=value: value
+        plan.append((name, _converter(field.annotation), default))
+    return tuple(plan)
+
+
+def _is_costly(annotation: Any, seen: set) -> bool:
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) in (list, List):
+        return any(_is_costly(arg, seen) for arg in get_args(annotation))
+    if annotation is EmailStr or isclass(annotation) and issubclass(annotation, AnyUrl):
+        return True
+    if isclass(annotation) and issubclass(annotation, BaseModel) and annotation not in seen:
+        seen.add(annotation)
+        decorators = annotation.__pydantic_decorators__
+        if decorators.field_validators:
+            return True
+        if any(validator.info.mode != "after" for validator in decorators.model_validators.values()):
+            return True
+        for field in annotation.model_fields.values():
+            if any(getattr(item, "pattern", None) for item in field.metadata):
+                return True
+            if _is_costly(field.annotation, seen):
+                return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def constructs_directly(cls: Type[BaseModel]) -> bool:
+    """
+    Whether validating `cls` runs field validators, non-"after" model validators, regexes, email or URL checks.
+    """
+    return _is_costly(cls, set())
+
+
+def _verify(cls: Type[M], row: dict, model: M):
+    try:
+        expected = cls.model_validate(row)
+    except ValidationError as error:
+        logger.warning("trusted %s row fails validation: %s", cls.__name__, error)
+        return
+    if expected != model:
+        logger.warning("trusted %s row differs from validated row: %r != %r", cls.__name__, model, expected)
+
+
+def trusted_load(cls: Type[M], row: dict, verify_rate: float = 0.0) -> M:
+    """
+    Build `cls` from a stored row without running its validators.
+    """
+    if not constructs_directly(cls):
+        try:
+            return cls.model_validate(row)
+        except ValidationError:
+            pass
+    return _construct(cls, row, verify_rate)
+
+
+def _construct(cls: Type[M], row: dict, verify_rate: float) -> M:
+    if cls.__private_attributes__:
+        return cls.model_construct(**row)
+    values = {}
+    fields_set = set()
+    for name, convert, default in _plan(cls):
+        if name in row:
+            value = row[name]
+            fields_set.add(name)
+            try:
+                values[name] = None if value is None else convert(value)
+            except ValueError as error:
+                raise ValueError(f"{cls.__name__}.{name}: {error}") from None
+        elif default is not None:
+            values[name] = default()
+    # same end state as model_construct, without its per-call bookkeeping
+    model = cls.__new__(cls)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    if verify_rate and random.random() < verify_rate:
+        _verify(cls, row, model)
+    return model
+
+
+class TrustedLoader():
+    """
+    Per-repository loading policy: trusted fast path or full validation.
+    """
+    def __init__(self, model: Type[M], trusted: bool = True, verify_rate: float = 0.0):
+        self.model = model
+        self.trusted = trusted
+        self.verify_rate = verify_rate
+
+    def load(self, row: dict, trusted: Optional[bool] = None) -> M:
+        """Load one row; `trusted` overrides the loader's default for this call."""
+        if self.trusted if trusted is None else trusted:
+            return trusted_load(self.model, row, self.verify_rate)
+        return self.model.model_validate(row)
+
+    def load_many(self, rows: Iterable[dict], trusted: Optional[bool] = None) -> List[M]:
+        return [self.load(row, trusted) for row in rows]
+
+
+if __name__ == "__main__":
+    # Read-path benchmark: rows shaped like driver output, loaded with full
+    # validation and with the trusted fast path.
+    import contextlib
+    import io
+    import runpy
+    import timeit
+    from typedefs.course import Course
+    from typedefs.user import UserActivity, UserEnrolment, UserProfile
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        examples = runpy.run_path("patient-info.py")
+    Patient = examples["Patient"]
+
+    stamp = datetime(2025, 5, 16, 20, 47)
+    lesson = {
+        "lesson_id": 1, "topic": "Validators", "description": "Field and model validators", "duration": 600,
+        "lesson_type": "video", "content": "https://example.com/1.mp4",
+        "created_at": stamp, "updated_at": stamp, "is_active": 1, "is_deleted": 0,
+    }
+    category = {"category_id": 2, "name": "Python", "description": None, "parent_category": None,
+                "created_at": stamp, "updated_at": stamp, "is_active": 1, "is_deleted": 0}
+    rows = {
+        Course: {
+            "course_id": 1, "title": "Pydantic in Depth", "description": "Models and validation", "instructor_id": 7,
+            "thumbnail": None, "price": Decimal("49.00"), "discount": None, "category": category, "prerequisites": None,
+            "modules": [
+                {"module_id": m, "name": f"Module {m}", "description": "", "lessons": [dict(lesson, lesson_id=m * 10 + i) for i in range(5)],
+                 "created_at": stamp, "updated_at": stamp, "is_active": 1, "is_deleted": 0}
+                for m in range(4)
+            ],
+            "created_at": stamp, "updated_at": stamp, "is_active": 1, "is_deleted": 0,
+        },
+        Patient: {
+            "id": 1, "name": "JOHN DOE", "email": "johndoe@icici.com", "age": 65, "phone": "+1-555-1234",
+            "linkedin": "https://www.linkedin.com/in/johndoe",
+            "address": {"street": "123 Main St", "city": "Anytown", "state": "CA", "zip": "12345"},
+            "weight": 70.5, "height": 175.0, "married": 0, "allergies": ["Peanuts"], "medications": ["Aspirin"],
+            "emergency": {"name": "Jane Doe", "relationship": "Sister", "phone": "+1-555-5678"},
+        },
+        UserProfile: {"user_id": 1, "first_name": "John", "last_name": "Doe", "bio": None, "profile_picture": None,
+                      "phone_number": "1234567890", "created_at": "2025-05-16T20:47:00", "updated_at": "2025-05-16T20:47:00"},
+        UserActivity: {"user_id": 1, "last_login": "2025-05-16T20:47:00", "last_activity": "2025-05-16T21:00:00",
+                       "created_at": None, "updated_at": None, "is_active": 1, "is_deleted": 0},
+        UserEnrolment: {"enrolment_id": 1, "user_id": 1, "course_id": 1, "enrollment_date": "2025-05-16",
+                        "progress": Decimal("42.50"), "is_active": 1, "is_deleted": 0, "is_completed": 0},
+    }
+
+    number = 5000
+    print(f"{'model':<16}{'path':>10}{'validate':>10}{'trusted':>10}{'speedup':>9}  (us/row)")
+    for cls, row in rows.items():
+        path = "construct" if constructs_directly(cls) else "core"
+        assert trusted_load(cls, row) == cls.model_validate(row), cls.__name__
+        full = timeit.timeit(lambda: cls.model_validate(row), number=number) / number * 1e6
+        fast = timeit.timeit(lambda: trusted_load(cls, row), number=number) / number * 1e6
+        print(f"{cls.__name__:<16}{path:>10}{full:>10.1f}{fast:>10.1f}{full / fast:>8.1f}x")
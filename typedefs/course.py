@@ -1,8 +1,9 @@
-from pydentic import BaseModel, Field #type:ignore
+from pydantic import BaseModel, Field #type:ignore
 from typing import  Optional
 from datetime import datetime
 from pydantic import field_validator, model_validator, computed_field #type:ignore
 from enum import Enum
+from instrumentation import instrument
 
 
 class LessonType(Enum):
@@ -29,8 +30,8 @@ class CoursePromotions(BaseModel):
     is_active: bool = True
     is_deleted: bool = False
     @model_validator(mode='after')  
-    def check_dates(cls, values: dict) -> dict:
-        if values.get("start_date") >= values.get("end_date"):
+    def check_dates(cls, values: "CoursePromotions") -> "CoursePromotions":
+        if values.start_date >= values.end_date:
             raise ValueError("Start date must be before end date")
         return values
 
@@ -45,8 +46,8 @@ class CourseCategory(BaseModel):
     is_active: bool = True
     is_deleted: bool = False
     @model_validator(mode='after')
-    def check_parent_category(cls, values: dict) -> dict:
-        if values.get("parent_category_id") == values.get("category_id"):
+    def check_parent_category(cls, values: "CourseCategory") -> "CourseCategory":
+        if values.parent_category and values.parent_category.category_id == values.category_id:
             raise ValueError("Parent category cannot be the same as the category itself")
         return values
     
@@ -93,6 +94,7 @@ class Course(BaseModel):
     is_deleted: bool = False
 
     @computed_field
+    @instrument("Course.total_duration", cheap=True)
     def total_duration(self) -> int:
         return sum(lesson.duration for module in self.modules for lesson in module.lessons) 
     
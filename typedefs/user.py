@@ -1,26 +1,34 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 from enum import Enum
 from datetime import datetime
 from pydantic import field_validator, model_validator, computed_field #type:ignore
 import bcrypt
 from typedefs.course import Course, CourseCategory
+from instrumentation import instrument
 
 
 class User(BaseModel):
+    # the password pattern uses look-aheads, which the default rust regex engine rejects
+    model_config = ConfigDict(regex_engine="python-re")
+
     user_id: int
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
     password: str = Field(..., min_length=8, pattern=r"^(?=.*[A-Za-z])(?=.*\d)[A-Za-z\d]{8,}$")
-    confirm_password: str = Field(..., min_length=8)
+    @model_validator(mode="before")
+    def check_passwords(cls, values):
+        # compares the raw input before hash_password runs; confirm_password is
+        # dropped here so the plaintext never ends up on the model
+        if isinstance(values, dict) and "confirm_password" in values:
+            values = dict(values)
+            if values.pop("confirm_password") != values.get("password"):
+                raise ValueError("Passwords do not match")
+        return values
     @field_validator("password")
+    @instrument("User.hash_password")
     def hash_password(cls, password: str) -> str:
         return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-    @model_validator(mode="after")
-    def check_passwords(cls, values: dict) -> dict:
-        if values.get("password") != values.get("confirm_password"):
-            raise ValueError("Passwords do not match")
-        return values
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = False
@@ -119,7 +127,7 @@ class InstructorRevenue(BaseModel):
     revenue: float
     enrolment_id: int
     payment_date: Optional[str] = Field(default=None)
-    revenue_split: float =  revenue # 70% to instructor, 30% to platform
+    revenue_split: float = 0.7 # 70% to instructor, 30% to platform
     created_at: Optional[str] = Field(default=None)
     updated_at: Optional[str] = Field(default=None) 
 
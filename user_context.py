@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Annotated, Dict, Iterable, Optional
+
+from pydantic import AfterValidator, BaseModel, BeforeValidator, PlainValidator, TypeAdapter, WrapValidator
+from sqlalchemy import bindparam, text
+
+from trusted import TrustedLoader
+from typedefs.user import User, UserActivity, UserProfile, UserSettings
+
+
+# User context loading for authenticated requests.
+#
+# `UserCache` is a process-wide, bounded LRU of UserContext objects keyed by
+# user_id. Each request gets its own identity map (`request_scope`), so every
+# lookup of the same user inside a request returns the same objects. Those are
+# per-request copies of the cached ones, so a handler that changes them never
+# affects other requests. Misses are loaded for all requested ids in a single
+# joined query, and every update made through the repository evicts the user
+# from both levels.
+#
+# Cache entries expire after CACHE_TTL seconds, which bounds staleness from
+# writes made outside this process. Within the process, every invalidation
+# bumps the cache generation, and a load only stores its result if the
+# generation is unchanged since the load started, so a row read just before a
+# concurrent update cannot be cached over that update.
+#
+# Updates validate each value against the model field it is written to (type,
+# constraints and field validators, so passwords are hashed on the way in).
+# Model validators need the whole row and are not run for partial updates.
+
+CACHE_SIZE = 10_000
+CACHE_TTL = 60.0
+
+USER_CONTEXT_SQL = text("""
+    SELECT u.user_id, u.username, u.email, u.password,
+           u.created_at, u.updated_at, u.is_active, u.is_deleted, u.is_verified,
+           p.user_id AS p_user_id, p.first_name AS p_first_name, p.last_name AS p_last_name,
+           p.bio AS p_bio, p.profile_picture AS p_profile_picture, p.phone_number AS p_phone_number,
+           p.created_at AS p_created_at, p.updated_at AS p_updated_at,
+           s.user_id AS s_user_id, s.email_notifications AS s_email_notifications,
+           s.sms_notifications AS s_sms_notifications, s.push_notifications AS s_push_notifications,
+           s.dark_mode AS s_dark_mode,
+           a.user_id AS a_user_id, a.last_login AS a_last_login, a.last_activity AS a_last_activity,
+           a.created_at AS a_created_at, a.updated_at AS a_updated_at,
+           a.is_active AS a_is_active, a.is_deleted AS a_is_deleted
+    FROM users u
+    LEFT JOIN user_profiles p ON p.user_id = u.user_id
+    LEFT JOIN user_settings s ON s.user_id = u.user_id
+    LEFT JOIN user_activity a ON a.user_id = u.user_id
+    WHERE u.user_id IN :user_ids
+""").bindparams(bindparam("user_ids", expanding=True))
+
+TABLES = {
+    User: "users",
+    UserProfile: "user_profiles",
+    UserSettings: "user_settings",
+    UserActivity: "user_activity",
+}
+
+
+class UserContext(BaseModel):
+    """
+    A user together with the related models most requests need.
+    """
+    user: User
+    profile: Optional[UserProfile] = None
+    settings: Optional[UserSettings] = None
+    activity: Optional[UserActivity] = None
+
+
+class UserCache():
+    """
+    Thread-safe, bounded LRU of UserContext keyed by user_id, with per-entry expiry.
+    """
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserContext]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, context = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return context
+
+    def put(self, user_id: int, context: UserContext, generation: Optional[int] = None):
+        """Store `context`, unless the cache was invalidated since `generation` was read."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, context)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+_identity_map: ContextVar[Optional[Dict[int, UserContext]]] = ContextVar("identity_map", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Give the enclosed request its own identity map."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+_VALIDATORS = {"before": BeforeValidator, "after": AfterValidator, "plain": PlainValidator, "wrap": WrapValidator}
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: type, name: str) -> TypeAdapter:
+    """Validator for a single field of `model`: its type, constraints and field validators."""
+    field = model.model_fields[name]
+    validators = [
+        _VALIDATORS[decorator.info.mode](decorator.func)
+        for decorator in model.__pydantic_decorators__.field_validators.values()
+        if name in decorator.info.fields or "*" in decorator.info.fields
+    ]
+    return TypeAdapter(Annotated[(field.annotation, field, *validators)], config=model.model_config)
+
+
+def _copy(context: UserContext) -> UserContext:
+    # shallow copies are enough: every field loaded from a row is an immutable scalar
+    return UserContext.model_construct(**{
+        name: None if value is None else value.model_copy() for name, value in context.__dict__.items()
+    })
+
+
+def _section(row, prefix: str, loader: TrustedLoader) -> Optional[BaseModel]:
+    if row[prefix + "user_id"] is None:
+        return None
+    return loader.load({name: row[prefix + name] for name in loader.model.model_fields if prefix + name in row})
+
+
+class UserRepository():
+    """
+    Loads and updates user contexts through the request identity map and the process cache.
+    """
+    def __init__(self, engine, cache: Optional[UserCache] = None, trusted: bool = True, verify_rate: float = 0.0):
+        self.engine = engine
+        self.cache = cache if cache is not None else UserCache()
+        # `trusted=False` and `verify_rate` only apply to the related models: a stored
+        # User row never validates (its bcrypt hash fails the password pattern and
+        # would be re-hashed), so sampling it would only log false drift warnings
+        self.loaders = {
+            model: TrustedLoader(model, trusted=trusted, verify_rate=verify_rate)
+            for model in (UserProfile, UserSettings, UserActivity)
+        }
+        self.loaders[User] = TrustedLoader(User)
+
+    def get(self, user_id: int) -> Optional[UserContext]:
+        return self.get_many([user_id]).get(user_id)
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, UserContext]:
+        identity_map = _identity_map.get()
+        if identity_map is None:
+            identity_map = {}
+        found: Dict[int, UserContext] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            context = identity_map.get(user_id)
+            if context is None:
+                cached = self.cache.get(user_id)
+                if cached is None:
+                    missing.append(user_id)
+                    continue
+                context = identity_map[user_id] = _copy(cached)
+            found[user_id] = context
+        if missing:
+            generation = self.cache.generation
+            for user_id, context in self._load(missing).items():
+                self.cache.put(user_id, context, generation)
+                found[user_id] = identity_map[user_id] = _copy(context)
+        return found
+
+    def _load(self, user_ids: list) -> Dict[int, UserContext]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(USER_CONTEXT_SQL, {"user_ids": user_ids}).mappings().all()
+        return {row["user_id"]: self._build_context(row) for row in rows}
+
+    def _build_context(self, row) -> UserContext:
+        user = self.loaders[User].load({
+            "user_id": row["user_id"],
+            "username": row["username"],
+            "email": row["email"],
+            "password": row["password"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "is_active": row["is_active"],
+            "is_deleted": row["is_deleted"],
+            "is_verified": row["is_verified"],
+        })
+        return UserContext.model_construct(
+            user=user,
+            profile=_section(row, "p_", self.loaders[UserProfile]),
+            settings=_section(row, "s_", self.loaders[UserSettings]),
+            activity=_section(row, "a_", self.loaders[UserActivity]),
+        )
+
+    def update(self, model: type, user_id: int, **values):
+        """Validate and update one of the user tables, and evict the user from every cache level."""
+        if not values:
+            return
+        if model is User and ("password" in values or "confirm_password" in values):
+            # confirm_password is not a User field; it only guards the plaintext password
+            if values.get("password") != values.pop("confirm_password", None):
+                raise ValueError("Passwords do not match")
+        unknown = set(values) - set(model.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown {model.__name__} fields: {', '.join(sorted(unknown))}")
+        values = {name: _field_adapter(model, name).validate_python(value) for name, value in values.items()}
+        assignments = ", ".join(f"{name} = :{name}" for name in values)
+        statement = text(f"UPDATE {TABLES[model]} SET {assignments} WHERE user_id = :user_id")
+        with self.engine.begin() as conn:
+            conn.execute(statement, {**values, "user_id": user_id})
+        self.invalidate(user_id)
+
+    def invalidate(self, user_id: int):
+        self.cache.invalidate(user_id)
+        identity_map = _identity_map.get()
+        if identity_map is not None:
+            identity_map.pop(user_id, None)